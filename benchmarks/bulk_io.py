@@ -0,0 +1,89 @@
+"""Measure import and export throughput of the import_data / export_data commands.
+
+Writes ``--rows`` synthetic tasks spread over ``--users`` users to an NDJSON (or
+CSV) file, imports them into a throwaway test database and exports them again,
+printing rows per second for each direction.
+
+    python benchmarks/bulk_io.py --rows 5000000 --chunk-size 5000
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings_worker")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+
+FIELDS = ["title", "description", "completed", "created_date", "deleted", "user_id", "status", "priority"]
+
+
+def synthetic_rows(count, user_ids):
+    for index in range(count):
+        yield {
+            "title": f"Task {index}",
+            "description": "Imported by the bulk I/O benchmark",
+            "completed": index % 4 == 0,
+            "created_date": "2026-01-01T00:00:00Z",
+            "deleted": False,
+            "user_id": user_ids[index % len(user_ids)],
+            "status": "PENDING",
+            "priority": index // len(user_ids) + 1,
+        }
+
+
+def write_dataset(path, fmt, count, user_ids):
+    with open(path, "w", newline="") as output:
+        if fmt == "csv":
+            writer = csv.DictWriter(output, FIELDS)
+            writer.writeheader()
+            writer.writerows(synthetic_rows(count, user_ids))
+        else:
+            for row in synthetic_rows(count, user_ids):
+                output.write(json.dumps(row))
+                output.write("\n")
+
+
+def timed(label, count, command, *args, **options):
+    started = time.perf_counter()
+    call_command(command, *args, stdout=open(os.devnull, "w"), stderr=open(os.devnull, "w"), **options)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>6}: {count} rows in {elapsed:.1f}s ({count / elapsed:.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="ndjson")
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        users = User.objects.bulk_create([User(username=f"bulk{index}") for index in range(args.users)])
+        with tempfile.TemporaryDirectory() as directory:
+            dataset = Path(directory) / f"tasks.{args.format}"
+            write_dataset(dataset, args.format, args.rows, [user.id for user in users])
+
+            timed("import", args.rows, "import_data", "task", input=str(dataset),
+                  format=args.format, chunk_size=args.chunk_size)
+            timed("export", args.rows, "export_data", "task", output=os.devnull,
+                  format=args.format, chunk_size=args.chunk_size)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
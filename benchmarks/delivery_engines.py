@@ -0,0 +1,108 @@
+"""Compare the serial and async report delivery engines against a slow local SMTP server.
+
+Starts an aiosmtpd server that waits ``--latency`` seconds before accepting each
+message, creates ``--reports`` pending deliveries in a throwaway test database and
+times both engines. Requires ``aiosmtpd`` on top of requirements.txt.
+
+    python benchmarks/delivery_engines.py --reports 200 --latency 0.05 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.mail import send_mail  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from tasks.async_delivery import deliver_batch  # noqa: E402
+from tasks.digest import REPORT_SENDER, REPORT_SUBJECT, build_digest, report_recipients  # noqa: E402
+from tasks.models import Report, ReportDelivery  # noqa: E402
+
+
+class SlowHandler:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        return "250 OK"
+
+
+def create_deliveries(count):
+    users = User.objects.bulk_create(
+        [User(username=f"bench{index}", email=f"bench{index}@example.com") for index in range(count)])
+    reports = Report.objects.bulk_create([Report(user=user, disabled=False) for user in users])
+    ReportDelivery.objects.bulk_create(
+        [ReportDelivery(report=report, date=date.today(), dispatched_at=timezone.now()) for report in reports])
+    return list(ReportDelivery.objects.values_list("id", flat=True))
+
+
+def reset(delivery_ids):
+    ReportDelivery.objects.filter(id__in=delivery_ids).update(status="PENDING", body=None, sent_at=None)
+
+
+def serial_engine(delivery_ids):
+    # the same work generate_report and deliver_report do, one report at a time
+    for delivery in ReportDelivery.objects.select_related("report__user").filter(id__in=delivery_ids):
+        delivery.status, delivery.body, delivery.fingerprint = build_digest(delivery)
+        send_mail(REPORT_SUBJECT, delivery.body, REPORT_SENDER, report_recipients(delivery.report.user))
+        delivery.status = "SENT"
+        delivery.save(update_fields=["status", "body", "fingerprint"])
+
+
+def timed(label, engine, delivery_ids):
+    reset(delivery_ids)
+    started = time.perf_counter()
+    engine(delivery_ids)
+    elapsed = time.perf_counter() - started
+    sent = ReportDelivery.objects.filter(id__in=delivery_ids, status="SENT").count()
+    print(f"{label:>6}: {sent} sent in {elapsed:.2f}s ({sent / elapsed:.1f} msg/s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = SlowHandler(args.latency)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    old_name = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=args.port,
+            REPORT_UNCHANGED_POLICY="send",
+        ):
+            delivery_ids = create_deliveries(args.reports)
+            serial = timed("serial", serial_engine, delivery_ids)
+            concurrent = timed(
+                "async", lambda ids: deliver_batch(ids, concurrency=args.concurrency), delivery_ids)
+        print(f"speedup: {serial / concurrent:.1f}x at {args.latency * 1000:.0f}ms injected latency")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure what the token bucket rate limiter adds to each request.
+
+Times the bucket store on its own and a full throttle check through DRF, for the
+in-memory store and, when RATE_LIMIT_REDIS_URL is set, the Redis store.
+
+    python benchmarks/rate_limit_overhead.py --requests 100000
+    RATE_LIMIT_REDIS_URL=redis://localhost:6379/1 python benchmarks/rate_limit_overhead.py
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from tasks import throttling  # noqa: E402
+from tasks.api import TaskApiViewset, TokenBucketThrottle  # noqa: E402
+from tasks.throttling import MemoryBucketStore, RedisBucketStore  # noqa: E402
+
+
+def per_call(function, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    # a limit high enough that every call takes a token, so the common path is measured
+    settings.RATE_LIMITS = {**settings.RATE_LIMITS, "task_api": f"{args.requests * 10}/s"}
+    stores = [MemoryBucketStore()]
+    if settings.RATE_LIMIT_REDIS_URL:
+        stores.append(RedisBucketStore())
+
+    request = Request(APIRequestFactory().get("/api/task/", REMOTE_ADDR="10.0.0.1"))
+    request.user = AnonymousUser()
+    view = TaskApiViewset()
+    throttle = TokenBucketThrottle()
+
+    for store in stores:
+        throttling._store = store
+        bucket = per_call(lambda: store.take("bench", 1e9, 1e9, time.time()), args.requests)
+        check = per_call(lambda: throttle.allow_request(request, view), args.requests)
+        print(f"{type(store).__name__}: {bucket:.2f}us per bucket take, {check:.2f}us per throttle check")
+
+
+if __name__ == "__main__":
+    main()
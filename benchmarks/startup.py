@@ -0,0 +1,108 @@
+"""Measure cold start import time of each settings profile with ``python -X importtime``.
+
+Each profile runs ``django.setup()`` plus the module its process needs first, in a
+fresh interpreter, a few times, and the fastest run is kept. ``--save`` records the
+results as a baseline; ``--baseline`` compares against it and exits non-zero when a
+profile got slower by more than ``--tolerance``. A profile that fails to start is
+reported on its own line and the run still covers the others, then exits non-zero.
+``worker-full`` starts a worker on the full settings, to compare with ``worker``.
+
+    python benchmarks/startup.py --save benchmarks/startup_baseline.json
+    python benchmarks/startup.py --baseline benchmarks/startup_baseline.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    "web": ("task_manager.settings", "task_manager.urls"),
+    "api": ("task_manager.settings_api", "task_manager.urls_api"),
+    "worker": ("task_manager.settings_worker", "tasks.tasks"),
+    # what a worker started before settings_worker existed, for comparison
+    "worker-full": ("task_manager.settings", "tasks.tasks"),
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class ProfileFailed(Exception):
+    pass
+
+
+def measure(settings_module, target):
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    code = f"import django; django.setup(); import {target}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        # e.g. Celery 4 cannot be imported on Python 3.11; keep the last line of the traceback
+        errors = [line for line in result.stderr.splitlines() if line.strip() and not IMPORT_LINE.match(line)]
+        raise ProfileFailed(errors[-1] if errors else f"exit status {result.returncode}")
+
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = int(self_us)
+            # top level imports are the ones with a single space of indentation
+            if len(indent) == 1:
+                total += int(cumulative_us)
+    return total / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to list per profile")
+    parser.add_argument("--save", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    for profile, (settings_module, target) in PROFILES.items():
+        try:
+            runs = [measure(settings_module, target) for _ in range(args.runs)]
+        except ProfileFailed as error:
+            print(f"{profile:>11}: failed ({settings_module} + {target}): {error}")
+            failures.append(profile)
+            continue
+        total, modules = min(runs, key=lambda run: run[0])
+        results[profile] = {"import_ms": round(total, 1), "modules": len(modules)}
+
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print(f"{profile:>11}: {total:7.1f}ms, {len(modules)} modules ({settings_module} + {target})")
+        for name, self_us in slowest:
+            print(f"{'':>13}{self_us / 1000:6.1f}ms {name}")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = [
+            f"{profile}: {results[profile]['import_ms']}ms vs {expected['import_ms']}ms baseline"
+            for profile, expected in baseline.items()
+            if profile in results and results[profile]["import_ms"] > expected["import_ms"] * (1 + args.tolerance)
+        ]
+        if regressions:
+            sys.exit("startup regressions:\n  " + "\n  ".join(regressions))
+        print(f"within {args.tolerance:.0%} of {args.baseline}")
+
+    if failures:
+        sys.exit(f"profiles that could not start: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure how the keyset-paginated task list pages scale with the size of an account.
+
+Fills a throwaway test database with a small account and a large one (``--tasks``
+tasks), then times the first page and a page deep into the list for each, along
+with the per-user task counts the page header shows, which are the only part of
+a page that reads every one of the user's tasks.
+
+    python benchmarks/task_list.py --tasks 50000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_manager.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count, Q  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from tasks.models import Task  # noqa: E402
+
+
+def create_account(name, count):
+    user = User.objects.create(username=name)
+    Task.objects.bulk_create(
+        Task(title=f"Task {index}", description="", priority=index + 1, completed=index % 4 == 0, user=user)
+        for index in range(count)
+    )
+    return user
+
+
+def per_call_ms(function, repeat):
+    function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--small", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        for name, count in (("small", args.small), ("large", args.tasks)):
+            user = create_account(name, count)
+            client = Client()
+            client.force_login(user)
+            deep_cursor = f"0,{count // 2},0"
+            tasks = Task.objects.filter(deleted=False, user=user)
+
+            first = per_call_ms(lambda: client.get("/all_tasks/"), args.repeat)
+            deep = per_call_ms(lambda: client.get("/all_tasks/", {"after": deep_cursor}), args.repeat)
+            counts = per_call_ms(lambda: tasks.aggregate(
+                total_count=Count("id"), completed_count=Count("id", filter=Q(completed=True))), args.repeat)
+            print(f"{count:>7} tasks: first page {first:.2f}ms, deep page {deep:.2f}ms, "
+                  f"of which task counts {counts:.2f}ms")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
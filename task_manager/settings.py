@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -86,6 +88,45 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+# Set CACHE_URL=redis://... so that every worker shares rendered report sections and the
+# render counters shown by report_digest_stats; without it each worker keeps its own
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["CACHE_URL"],
+    } if "CACHE_URL" in os.environ else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+# Rate limiting
+# Token buckets per endpoint scope, written like DRF throttle rates. Buckets are kept in process
+# memory unless RATE_LIMIT_REDIS_URL points at a Redis server shared by every web worker.
+# Anonymous clients are told apart by IP the way DRF throttles do it; behind a reverse proxy set
+# REST_FRAMEWORK["NUM_PROXIES"] so the address comes from X-Forwarded-For.
+
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_STORE = (
+    "tasks.throttling.RedisBucketStore" if RATE_LIMIT_REDIS_URL
+    else "tasks.throttling.MemoryBucketStore"
+)
+RATE_LIMITS = {
+    "task_api": "120/min",
+    "history_api": "120/min",
+    "signup": "5/hour",
+}
+
+# Task writes allowed to run at once before new ones are turned away. They are counted in the
+# rate limit store, so the limit covers every web worker only when RATE_LIMIT_REDIS_URL is set;
+# a slot left behind by a killed worker expires after WRITE_SLOT_TIMEOUT seconds
+WRITE_CONCURRENCY_LIMIT = 8
+WRITE_SLOT_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -139,7 +180,59 @@ INTERNAL_IPS = [
 
 TAILWIND_APP_NAME = "theme"
 
-BROKER_URL = "redis://localhost:6379/"
+# Celery
+# https://docs.celeryproject.org/en/v4.4.7/userguide/configuration.html
+
+# Set CELERY_BROKER_URL=memory:// and CELERY_TASK_ALWAYS_EAGER=1 to run the report
+# pipeline in-process without a broker
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/")
 CELERY_RESULT_BACKEND = "redis://localhost:6379"
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER") == "1"
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Task payloads are plain ids and strings, so either serializer works
+CELERY_TASK_SERIALIZER = os.environ.get("CELERY_TASK_SERIALIZER", "json")
+CELERY_ACCEPT_CONTENT = ["json", "msgpack"]
+
+# Acknowledge after the task finishes so a killed worker hands its report back to the queue
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_WORKER_CONCURRENCY = int(os.environ.get("CELERY_WORKER_CONCURRENCY", 4))
+CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
+
+CELERY_TASK_DEFAULT_QUEUE = "reports.generate"
+CELERY_TASK_ROUTES = {
+    "tasks.tasks.batch_email": {"queue": "reports.generate"},
+    "tasks.tasks.generate_report": {"queue": "reports.generate"},
+    "tasks.tasks.deliver_report": {"queue": "reports.deliver"},
+    "tasks.tasks.deliver_report_batch": {"queue": "reports.deliver"},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    "batch-email": {
+        "task": "tasks.tasks.batch_email",
+        "schedule": timedelta(minutes=1),
+        # a tick that waited longer than the interval is superseded by the next one
+        "options": {"expires": 55},
+    },
+}
+
+# Unsent report deliveries older than this are handed to a new worker on the next tick
+REPORT_DELIVERY_RETRY_AFTER = timedelta(minutes=15)
+
+# A delivery claimed for sending longer ago than this is taken to belong to a dead worker and
+# is handed out again; it has to outlast the hard time limit of every task that sends mail
+REPORT_DELIVERY_SEND_TIMEOUT = timedelta(minutes=15)
+
+# "serial" renders and sends each report in its own task; "async" hands batches of reports to
+# tasks.async_delivery, which sends up to REPORT_ASYNC_CONCURRENCY messages at once over aiosmtplib
+REPORT_DELIVERY_ENGINE = os.environ.get("REPORT_DELIVERY_ENGINE", "serial")
+REPORT_ASYNC_CONCURRENCY = 20
+REPORT_ASYNC_BATCH_SIZE = 500
+
+# What to do when a report matches the last one sent: "send" it again, send a "short" notice, or "skip" it
+REPORT_UNCHANGED_POLICY = os.environ.get("REPORT_UNCHANGED_POLICY", "short")
 
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
@@ -0,0 +1,31 @@
+"""
+Settings profile for processes that only serve the REST API.
+
+Drops the admin, the tailwind theme and the HTML views, and renders responses
+as JSON only. Run with DJANGO_SETTINGS_MODULE=task_manager.settings_api.
+"""
+
+from task_manager.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    "tasks",
+    "rest_framework",
+    "django_filters"
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+]
+
+ROOT_URLCONF = 'task_manager.urls_api'
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+}
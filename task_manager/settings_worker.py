@@ -0,0 +1,30 @@
+"""
+Settings profile for Celery workers and beat.
+
+Workers only read tasks and reports, render the report templates and send
+mail, so everything serving HTTP is left out. task_manager.celery selects
+this profile unless DJANGO_SETTINGS_MODULE is already set. Management
+commands that only touch the models can use it too:
+
+    python3 manage.py recompute_report_schedule --settings=task_manager.settings_worker
+"""
+
+from task_manager.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    "tasks",
+]
+
+MIDDLEWARE = []
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': ["templates"],
+        'APP_DIRS': False,
+    },
+]
+
+ROOT_URLCONF = 'task_manager.urls_worker'
@@ -16,14 +16,10 @@ Including another URLconf
 from django.contrib import admin
 from django.contrib.auth.views import LogoutView
 from django.urls import path
-from rest_framework.routers import SimpleRouter
+from task_manager.urls_api import urlpatterns as api_urlpatterns
 from tasks.views import (AddTaskView, AllTasksView, CompletedTasksView, ScheduleReportView,
-                         CurrentTasksView, DeleteTaskView, TaskApiViewset, TaskHistoryApiViewset,
-                         UpdateTaskView, UserCreateView, UserLoginView)
-
-router = SimpleRouter()
-router.register("api/task", TaskApiViewset)
-router.register("api/history", TaskHistoryApiViewset)
+                         CurrentTasksView, DeleteTaskView, UpdateTaskView, UserCreateView,
+                         UserLoginView)
 
 urlpatterns = [
     path("", CurrentTasksView.as_view()),
@@ -38,4 +34,4 @@ urlpatterns = [
     path("user/signup/", UserCreateView.as_view()),
     path("user/logout/", LogoutView.as_view()),
     path("user/report/<pk>/", ScheduleReportView.as_view()),
-] + router.urls
+] + api_urlpatterns
@@ -0,0 +1,13 @@
+"""task_manager API URL Configuration
+
+Serves only the REST API. Used on its own by the API-only settings profile
+(task_manager.settings_api) and included by the full task_manager.urls.
+"""
+from rest_framework.routers import SimpleRouter
+from tasks.api import TaskApiViewset, TaskHistoryApiViewset
+
+router = SimpleRouter()
+router.register("api/task", TaskApiViewset)
+router.register("api/history", TaskHistoryApiViewset)
+
+urlpatterns = router.urls
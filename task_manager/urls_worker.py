@@ -0,0 +1,7 @@
+"""task_manager worker URL Configuration
+
+Workers and beat serve no HTTP, so the worker settings profile
+(task_manager.settings_worker) points ROOT_URLCONF at this empty URLconf.
+"""
+
+urlpatterns = []
@@ -1,17 +1,102 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
 
 # Register your models here.
 
-from tasks.models import Task, Report
+from tasks.models import Report, ReportDelivery, Task, TaskHistory
 
 
-class TaskAdmin(admin.ModelAdmin):
+class EstimatedCountPaginator(Paginator):
+    # An unfiltered changelist over a large table shows an estimated row count instead of
+    # running COUNT(*): PostgreSQL's planner statistics, or the highest primary key elsewhere
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where:
+            return super().count
+
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table]
+                )
+                estimate = cursor.fetchone()[0]
+        else:
+            estimate = queryset.model._default_manager.using(queryset.db).aggregate(
+                estimate=Max("pk"))["estimate"] or 0
+
+        return estimate if estimate > self.estimate_threshold else super().count
+
+
+def title_prefix(queryset, prefix):
+    # Case-sensitive title prefix match that task_title_prefix_idx can serve. SQLite's LIKE
+    # ignores case and never uses an index, but a range over the binary-collated index is
+    # the same prefix match
+    if connections[queryset.db].vendor == "sqlite":
+        return Q(title__gte=prefix, title__lt=prefix + chr(0x10FFFF))
+    return Q(title__startswith=prefix)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class TaskAdmin(LargeTableAdmin):
     list_display = ("id", "priority", "title", "completed", "deleted", "user")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    # Searches by exact id or title prefix. The default "=id" lookup is an iexact, which
+    # compiles to a LIKE on the id column and scans the table, hence get_search_results
+    search_fields = ("=id", "^title")
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = title_prefix(queryset, term)
+        if term.isdigit():
+            condition |= Q(pk=int(term))
+        return queryset.filter(condition), False
+
+
+class TaskHistoryAdmin(LargeTableAdmin):
+    list_display = ("id", "task", "from_status", "to_status", "timestamp")
+    list_select_related = ("task__user",)
+    raw_id_fields = ("task",)
+    date_hierarchy = "timestamp"
+    # searches by task id through the task_id foreign key index
+    search_fields = ("=task__id",)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if not term.isdigit():
+            return queryset.none(), False
+        return queryset.filter(task_id=int(term)), False
 
 
 class ReportAdmin(admin.ModelAdmin):
     list_display = ("user", "time")
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+
+
+class ReportDeliveryAdmin(LargeTableAdmin):
+    list_display = ("report", "date", "status", "dispatched_at", "sent_at")
+    list_filter = ("status",)
+    raw_id_fields = ("report",)
 
 
 admin.sites.site.register(Task, TaskAdmin)
+admin.sites.site.register(TaskHistory, TaskHistoryAdmin)
 admin.sites.site.register(Report, ReportAdmin)
+admin.sites.site.register(ReportDelivery, ReportDeliveryAdmin)
@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django_filters.rest_framework import (BooleanFilter, CharFilter,
+                                           ChoiceFilter, DateFromToRangeFilter,
+                                           DjangoFilterBackend, FilterSet,
+                                           ModelChoiceFilter)
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.serializers import ModelSerializer
+from rest_framework.throttling import BaseThrottle
+from rest_framework.viewsets import ModelViewSet
+
+from tasks.models import STATUS_CHOICES, Task, TaskHistory
+from tasks.throttling import WriteConcurrencyLimitMixin, client_ident, take_token
+
+
+class TokenBucketThrottle(BaseThrottle):
+    # Reads the view's throttle_scope; signed-in users get a bucket each, everyone else shares one per IP
+
+    def allow_request(self, request, view):
+        ident = f"user:{request.user.pk}" if request.user.is_authenticated else f"ip:{client_ident(request)}"
+        allowed, self.retry_after = take_token(view.throttle_scope, ident)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserSerializer(ModelSerializer):
+    class Meta:
+        model = User
+        fields = ["username"]
+
+
+class TaskSerializer(ModelSerializer):
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Task
+        fields = "__all__"
+
+
+class TaskFilter(FilterSet):
+    title = CharFilter(lookup_expr="icontains")
+    status = ChoiceFilter(choices=STATUS_CHOICES)
+    completed = BooleanFilter()
+
+
+class TaskApiViewset(WriteConcurrencyLimitMixin, ModelViewSet):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "task_api"
+    queryset = Task.objects.filter(deleted=False)
+    serializer_class = TaskSerializer
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskFilter
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class TaskHistorySerializer(ModelSerializer):
+    class Meta:
+        model = TaskHistory
+        fields = "__all__"
+
+
+class TaskHistoryFilter(FilterSet):
+    task = ModelChoiceFilter(queryset=Task.objects.filter(deleted=False))
+    timestamp = DateFromToRangeFilter()
+    from_status = ChoiceFilter(choices=STATUS_CHOICES)
+    to_status = ChoiceFilter(choices=STATUS_CHOICES)
+
+
+class TaskHistoryApiViewset(ModelViewSet):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = "history_api"
+    serializer_class = TaskHistorySerializer
+    queryset = TaskHistory.objects.all()
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskHistoryFilter
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from email.message import EmailMessage
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from tasks.digest import REPORT_SENDER, REPORT_SUBJECT, report_recipients
+from tasks.ledger import claim_delivery, finish_delivery, prepare_delivery, release_delivery
+
+# Async engine for the send stage, selected with REPORT_DELIVERY_ENGINE = "async".
+# Messages go straight to EMAIL_HOST over aiosmtplib, so EMAIL_BACKEND is not consulted.
+# Database and render work stays synchronous and runs through sync_to_async with the
+# default thread_sensitive=True: one thread holds one connection for the whole batch,
+# which keeps SQLite free of lock contention. Only the SMTP round trips overlap.
+
+logger = logging.getLogger(__name__)
+
+# aiosmtplib's own default; EMAIL_TIMEOUT = None would otherwise let a stalled server hold a
+# concurrency slot until the batch task is killed
+SMTP_TIMEOUT = 60
+
+
+class ReportDeliveryFailed(Exception):
+    pass
+
+
+def _claim(delivery_id):
+    # Renders the entry if needed and claims it like deliver_report does, so an entry that
+    # another batch or a serial task is already sending is left to that worker
+    if not prepare_delivery(delivery_id):
+        return None
+    delivery = claim_delivery(delivery_id)
+    if delivery is None:
+        return None
+
+    message = EmailMessage()
+    message["Subject"] = REPORT_SUBJECT
+    message["From"] = REPORT_SENDER
+    message["To"] = ", ".join(report_recipients(delivery.report.user))
+    message.set_content(delivery.body)
+    return message
+
+
+async def _deliver(delivery_id, semaphore):
+    import aiosmtplib
+
+    message = await sync_to_async(_claim)(delivery_id)
+    if message is None:
+        return False
+
+    try:
+        async with semaphore:
+            await aiosmtplib.send(
+                message,
+                hostname=settings.EMAIL_HOST,
+                port=settings.EMAIL_PORT,
+                username=settings.EMAIL_HOST_USER or None,
+                password=settings.EMAIL_HOST_PASSWORD or None,
+                use_tls=settings.EMAIL_USE_SSL,
+                start_tls=settings.EMAIL_USE_TLS or None,
+                timeout=settings.EMAIL_TIMEOUT or SMTP_TIMEOUT,
+            )
+    except BaseException:
+        await sync_to_async(release_delivery)(delivery_id)
+        raise
+
+    await sync_to_async(finish_delivery)(delivery_id)
+    return True
+
+
+async def deliver_all(delivery_ids, concurrency=None):
+    # Returns the ids whose send failed. Their entries stay RENDERED, so a retry only
+    # has to send them again.
+    semaphore = asyncio.Semaphore(concurrency or settings.REPORT_ASYNC_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_deliver(delivery_id, semaphore) for delivery_id in delivery_ids),
+        return_exceptions=True
+    )
+
+    failed = []
+    for delivery_id, result in zip(delivery_ids, results):
+        if isinstance(result, BaseException):
+            logger.error("Report delivery %s failed: %r", delivery_id, result, exc_info=result)
+            failed.append(delivery_id)
+    return failed
+
+
+def deliver_batch(delivery_ids, concurrency=None):
+    return asyncio.run(deliver_all(delivery_ids, concurrency))
@@ -0,0 +1,149 @@
+import csv
+import json
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+
+from tasks.models import Report, Task, TaskHistory
+
+MODELS = {
+    "task": Task,
+    "history": TaskHistory,
+    "report": Report,
+}
+
+
+def model_fields(model):
+    return list(model._meta.concrete_fields)
+
+
+def export_rows(model, output, fmt, chunk_size):
+    fields = model_fields(model)
+    names = [field.attname for field in fields]
+    # iterator() streams from a server-side cursor where the database has one
+    rows = model.objects.order_by("pk").values_list(*names).iterator(chunk_size=chunk_size)
+
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(output)
+        writer.writerow(names)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            output.write(encoder.encode(dict(zip(names, row))))
+            output.write("\n")
+            count += 1
+    return count
+
+
+def read_rows(source, fmt):
+    if fmt == "csv":
+        yield from csv.DictReader(source)
+    else:
+        for line in source:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_instance(model, fields, row, stamped):
+    values = {}
+    for field in fields:
+        if field.attname not in row:
+            # a row without its own timestamp gets what auto_now would have given it
+            if field in stamped:
+                values[field.attname] = timezone.now()
+            continue
+        value = row[field.attname]
+        # CSV cannot tell an empty string from NULL; nullable columns take NULL
+        if value == "" and field.null:
+            value = None
+        values[field.attname] = field.to_python(value) if value is not None else None
+    return model(**values)
+
+
+def auto_now_fields(model):
+    return [field for field in model_fields(model) if getattr(field, "auto_now", False)]
+
+
+@contextmanager
+def preserved_timestamps(fields):
+    # auto_now fields would stamp every imported row with the import time
+    for field in fields:
+        field.auto_now = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now = True
+
+
+class PriorityResolver:
+    # Open tasks of one user must not share a priority. Existing priorities are loaded
+    # once per user the first time a chunk mentions them; an imported task whose
+    # priority is taken moves to the next free one, so existing rows are never touched.
+    # Each taken priority points at a higher candidate and the pointers are shortened
+    # on every lookup, so a run of colliding rows costs linear rather than quadratic time.
+
+    def __init__(self):
+        self.next_free = {}
+
+    def take(self, user_id, priority):
+        pointers = self.next_free[user_id]
+        passed = []
+        while priority in pointers:
+            passed.append(priority)
+            priority = pointers[priority]
+        for taken in passed:
+            pointers[taken] = priority + 1
+        pointers[priority] = priority + 1
+        return priority
+
+    def resolve(self, tasks):
+        new_users = {task.user_id for task in tasks if task.user_id is not None} - self.next_free.keys()
+        for user_id in new_users:
+            self.next_free[user_id] = {}
+        for user_id, priority in Task.objects.filter(
+            user_id__in=new_users, deleted=False, completed=False
+        ).values_list("user_id", "priority"):
+            self.next_free[user_id][priority] = priority + 1
+
+        for task in tasks:
+            if task.deleted or task.completed or task.user_id is None:
+                continue
+            task.priority = self.take(task.user_id, task.priority)
+
+
+def import_rows(model, source, fmt, chunk_size):
+    fields = model_fields(model)
+    stamped = auto_now_fields(model)
+    resolver = PriorityResolver() if model is Task else None
+
+    count = 0
+    with preserved_timestamps(stamped):
+        chunk = []
+        for row in read_rows(source, fmt):
+            chunk.append(build_instance(model, fields, row, stamped))
+            if len(chunk) == chunk_size:
+                count += _insert(model, chunk, resolver)
+                chunk = []
+        if chunk:
+            count += _insert(model, chunk, resolver)
+
+    # rows imported with their own ids leave the primary key sequence behind on PostgreSQL
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(statement)
+    return count
+
+
+def _insert(model, chunk, resolver):
+    if resolver:
+        resolver.resolve(chunk)
+    model.objects.bulk_create(chunk)
+    return len(chunk)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Subquery
+from django.template.loader import render_to_string
+
+from tasks.models import ReportDelivery, Task
+
+REPORT_SUBJECT = "Daily Status Report"
+REPORT_SENDER = "tasks@taskmanager.com"
+
+# Render counters live in the cache, so they only cover every worker when CACHE_URL
+# points at a shared cache; with the default LocMemCache each worker counts its own
+METRICS = ("renders", "renders_reused")
+METRICS_TIMEOUT = 60 * 60 * 48
+
+
+def user_summary(user):
+    counts = Task.objects.filter(user=user, completed=False, deleted=False).values(
+        "status").annotate(count=Count("id")).order_by("status")
+    return {
+        "name": user.username.capitalize(),
+        "status": {row["status"]: row["count"] for row in counts}
+    }
+
+
+def report_recipients(user):
+    return [user.email, "dummy@user.com"]
+
+
+def summary_fingerprint(status):
+    return hashlib.sha256(json.dumps(status, sort_keys=True).encode()).hexdigest()
+
+
+def previous_fingerprint(delivery):
+    return ReportDelivery.objects.filter(
+        report_id=delivery.report_id, date__lt=delivery.date, status="SENT"
+    ).order_by("-date").values_list("fingerprint", flat=True).first()
+
+
+def _metrics_key(date, name):
+    return f"report-metrics:{date.isoformat()}:{name}"
+
+
+def record_metric(date, name):
+    key = _metrics_key(date, name)
+    cache.add(key, 0, METRICS_TIMEOUT)
+    cache.incr(key)
+
+
+def render_status(status, fingerprint, date):
+    # Subscribers with the same breakdown share one rendered status section per day
+    key = f"report-status:{date.isoformat()}:{fingerprint}"
+    body = cache.get(key)
+    if body is None:
+        body = render_to_string("report_status.txt", {"status": status})
+        cache.set(key, body, METRICS_TIMEOUT)
+        record_metric(date, "renders")
+    else:
+        record_metric(date, "renders_reused")
+    return body
+
+
+def build_digest(delivery):
+    # Returns the ledger status, body and fingerprint for a pending delivery.
+    # REPORT_UNCHANGED_POLICY decides what happens when the summary matches the last sent
+    # report: "send" repeats it, "short" sends a one-line notice and "skip" sends nothing.
+    summary = user_summary(delivery.report.user)
+    fingerprint = summary_fingerprint(summary["status"])
+    policy = settings.REPORT_UNCHANGED_POLICY
+
+    if policy != "send" and fingerprint == previous_fingerprint(delivery):
+        if policy == "skip":
+            return "SKIPPED", None, fingerprint
+        return "RENDERED", render_to_string("report_unchanged.txt", summary), fingerprint
+
+    body = render_to_string("report.txt", {
+        "name": summary["name"],
+        "status_body": render_status(summary["status"], fingerprint, delivery.date),
+    })
+    return "RENDERED", body, fingerprint
+
+
+def digest_stats(date):
+    # Skipped and shortened sends are counted from the ledger, which every worker shares.
+    # A digest counts as shortened when its summary matched the last sent one while the
+    # "short" policy is in effect.
+    stats = cache.get_many([_metrics_key(date, name) for name in METRICS])
+    stats = {name: stats.get(_metrics_key(date, name), 0) for name in METRICS}
+
+    prepared = ReportDelivery.objects.filter(date=date).exclude(status="PENDING")
+    stats["digests"] = prepared.count()
+    stats["sends_skipped"] = prepared.filter(status="SKIPPED").count()
+    stats["sends_shortened"] = 0
+    if settings.REPORT_UNCHANGED_POLICY == "short":
+        previous = ReportDelivery.objects.filter(
+            report_id=OuterRef("report_id"), date__lt=date, status="SENT"
+        ).order_by("-date").values("fingerprint")[:1]
+        stats["sends_shortened"] = prepared.exclude(status="SKIPPED").annotate(
+            previous_fingerprint=Subquery(previous)).filter(previous_fingerprint=F("fingerprint")).count()
+
+    digests = stats["digests"]
+    stats["render_avoided_share"] = (
+        (stats["renders_reused"] + stats["sends_shortened"] + stats["sends_skipped"]) / digests
+        if digests else 0.0
+    )
+    stats["send_avoided_share"] = stats["sends_skipped"] / digests if digests else 0.0
+    return stats
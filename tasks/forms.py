@@ -3,6 +3,7 @@ from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.forms import ModelForm
 
 from tasks.models import Report, Task
+from tasks.scheduling import timezone_choices
 
 
 class TaskForm(ModelForm):
@@ -40,9 +41,11 @@ class ScheduleReportForm(ModelForm):
             attrs={"type": "time"}
         ),
         required=True,
-        help_text="<small><em>Use UTC time</em></small>"
+        help_text="<small><em>Local time in the timezone below</em></small>"
     )
 
+    timezone = forms.ChoiceField(choices=timezone_choices, initial="UTC")
+
     disabled = forms.BooleanField(
         widget=forms.CheckboxInput(),
         label="Disable daily reports",
@@ -51,7 +54,7 @@ class ScheduleReportForm(ModelForm):
 
     class Meta:
         model = Report
-        fields = ["time", "disabled"]
+        fields = ["time", "timezone", "disabled"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from tasks.digest import build_digest
+from tasks.models import Report, ReportDelivery
+from tasks.scheduling import local_date, next_fire_time
+
+# Delivery ledger steps of the report pipeline. The Celery tasks in tasks.tasks only
+# move ids between these functions, so the ledger works (and is tested) without a broker.
+
+
+def open_deliveries(now):
+    # Writes today's ledger entries for every due report and returns the ids to hand to
+    # workers: the new entries along with unsent ones whose worker went away
+    with transaction.atomic():
+        report_set = Report.objects.select_for_update(skip_locked=True).filter(
+            next_run__lte=now,
+            disabled=False
+        ).only("id", "time", "timezone", "next_run")
+
+        due = []
+        deliveries = []
+        for report in report_set:
+            # the ledger is keyed on the day the report was due in the user's own timezone
+            deliveries.append(ReportDelivery(
+                report=report, date=local_date(report.next_run, report.timezone), dispatched_at=now))
+            report.last_updated = now
+            report.next_run = next_fire_time(report.time, report.timezone, now)
+            due.append(report)
+        Report.objects.bulk_update(due, ["last_updated", "next_run"])
+
+        # the unique (report, date) key turns a second run on the same day into a no-op
+        ReportDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+
+        # a claim that outlived REPORT_DELIVERY_SEND_TIMEOUT lost its worker mid-send
+        ReportDelivery.objects.filter(
+            status="SENDING", claimed_at__lte=now - settings.REPORT_DELIVERY_SEND_TIMEOUT
+        ).update(status="RENDERED", claimed_at=None)
+
+        pending = ReportDelivery.objects.select_for_update(skip_locked=True).exclude(
+            status__in=["SENDING", "SENT", "SKIPPED"]
+        ).filter(
+            Q(dispatched_at=now) | Q(dispatched_at__lte=now - settings.REPORT_DELIVERY_RETRY_AFTER)
+        )
+        delivery_ids = list(pending.values_list("id", flat=True))
+        ReportDelivery.objects.filter(id__in=delivery_ids).update(dispatched_at=now)
+    return delivery_ids
+
+
+def prepare_delivery(delivery_id):
+    # Renders a pending entry and says whether it is ready to send. A resumed entry keeps
+    # the body rendered by the previous attempt.
+    delivery = ReportDelivery.objects.select_related("report__user").get(id=delivery_id)
+
+    if delivery.status == "PENDING":
+        delivery.status, delivery.body, delivery.fingerprint = build_digest(delivery)
+        delivery.save(update_fields=["status", "body", "fingerprint"])
+
+    return delivery.status == "RENDERED"
+
+
+def claim_delivery(delivery_id):
+    # Moves a rendered entry to SENDING with one conditional UPDATE, which is atomic on
+    # every backend (select_for_update is a no-op on SQLite). Only the worker whose update
+    # changed the row gets it back and may send it; everyone else gets None.
+    claimed = ReportDelivery.objects.filter(id=delivery_id, status="RENDERED").update(
+        status="SENDING", claimed_at=timezone.now())
+    if not claimed:
+        return None
+    return ReportDelivery.objects.select_related("report__user").get(id=delivery_id)
+
+
+def finish_delivery(delivery_id):
+    ReportDelivery.objects.filter(id=delivery_id, status="SENDING").update(
+        status="SENT", sent_at=timezone.now())
+
+
+def release_delivery(delivery_id):
+    # a failed send hands the entry back, so the retry can claim it again
+    ReportDelivery.objects.filter(id=delivery_id, status="SENDING").update(
+        status="RENDERED", claimed_at=None)
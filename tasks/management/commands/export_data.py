@@ -0,0 +1,31 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.bulk_io import MODELS, export_rows
+
+
+class Command(BaseCommand):
+    help = "Stream tasks, task history or reports out as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=MODELS.keys())
+        parser.add_argument("--format", choices=["csv", "ndjson"], default="ndjson")
+        parser.add_argument("--output", default="-", help="File to write to, - for stdout")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Rows fetched from the database cursor at a time")
+
+    def handle(self, *args, **options):
+        # call_command("export_data", ..., stdout=stream) writes the rows to stream
+        stdout = options.get("stdout") or sys.stdout
+        output = stdout if options["output"] == "-" else open(options["output"], "w", newline="")
+        started = time.perf_counter()
+        try:
+            count = export_rows(MODELS[options["model"]], output, options["format"], options["chunk_size"])
+        finally:
+            if output is not stdout:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(f"Exported {count} row(s) in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} rows/s)")
@@ -0,0 +1,39 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.bulk_io import MODELS, import_rows
+
+
+class Command(BaseCommand):
+    help = ("Stream tasks, task history or reports in from CSV or NDJSON written by export_data. "
+            "Rows keep their ids, so this restores into an empty database")
+    # call_command("import_data", ..., stdin=stream) reads from stream instead of sys.stdin
+    stealth_options = ("stdin",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=MODELS.keys())
+        parser.add_argument("--format", choices=["csv", "ndjson"], default="ndjson")
+        parser.add_argument("--input", default="-", help="File to read from, - for stdin")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Rows inserted per bulk_create")
+        parser.add_argument("--atomic", action="store_true",
+                            help="Import in one transaction, so a failing row leaves no earlier chunk behind")
+
+    def handle(self, *args, **options):
+        stdin = options.get("stdin", sys.stdin)
+        source = stdin if options["input"] == "-" else open(options["input"], newline="")
+        started = time.perf_counter()
+        try:
+            with transaction.atomic() if options["atomic"] else nullcontext():
+                count = import_rows(MODELS[options["model"]], source, options["format"], options["chunk_size"])
+        finally:
+            if source is not stdin:
+                source.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {count} row(s) in {elapsed:.1f}s ({count / max(elapsed, 1e-9):.0f} rows/s)"))
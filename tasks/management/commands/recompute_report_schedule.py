@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import Report
+from tasks.scheduling import recompute_next_runs
+
+
+class Command(BaseCommand):
+    help = "Recompute the next UTC run of every scheduled report, e.g. after a tzdata upgrade"
+
+    def handle(self, *args, **options):
+        updated = recompute_next_runs(Report.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Rescheduled {updated} report(s)"))
@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from tasks.digest import digest_stats
+
+
+class Command(BaseCommand):
+    help = ("Show how many report renders and sends the digest deduplication avoided on a day. "
+            "Skipped and shortened sends come from the ledger; render counts need a shared CACHE_URL")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", type=date.fromisoformat, default=date.today(),
+                            help="Ledger day in YYYY-MM-DD format, defaults to today")
+
+    def handle(self, *args, **options):
+        for name, value in digest_stats(options["date"]).items():
+            self.stdout.write(f"{name}: {value:.2%}" if name.endswith("_share") else f"{name}: {value}")
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_report_disabled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('RENDERED', 'RENDERED'), ('SENT', 'SENT')], default='PENDING', max_length=20)),
+                ('body', models.TextField(null=True)),
+                ('dispatched_at', models.DateTimeField()),
+                ('sent_at', models.DateTimeField(null=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.report')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reportdelivery',
+            index=models.Index(fields=['status', 'dispatched_at'], name='tasks_repor_status_00dfb0_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportdelivery',
+            constraint=models.UniqueConstraint(fields=('report', 'date'), name='unique_report_delivery_per_day'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:41
+
+from datetime import datetime, timedelta, timezone
+
+from django.db import migrations, models
+
+
+def schedule_existing_reports(apps, schema_editor):
+    # A frozen copy of what tasks.scheduling computed when this migration was written, so
+    # later changes there leave it alone. Every report is still on the new column's default
+    # timezone of UTC, so its next run is the next time its wall clock time comes round in UTC.
+    Report = apps.get_model("tasks", "Report")
+    now = datetime.now(timezone.utc)
+    reports = Report.objects.filter(time__isnull=False)
+
+    for local_time in reports.values_list("time", flat=True).distinct().order_by():
+        next_run = datetime.combine(now.date(), local_time.replace(tzinfo=None), tzinfo=timezone.utc)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        reports.filter(time=local_time).update(next_run=next_run)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_reportdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='next_run',
+            field=models.DateTimeField(db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64),
+        ),
+        migrations.RunPython(schedule_existing_reports, migrations.RunPython.noop),
+    ]
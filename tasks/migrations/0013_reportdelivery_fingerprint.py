@@ -0,0 +1,23 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_report_timezone_next_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportdelivery',
+            name='fingerprint',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportdelivery',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'PENDING'), ('RENDERED', 'RENDERED'), ('SENT', 'SENT'), ('SKIPPED', 'SKIPPED')], default='PENDING', max_length=20),
+        ),
+    ]
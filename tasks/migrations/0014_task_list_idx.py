@@ -0,0 +1,17 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_reportdelivery_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'deleted', 'completed', 'priority', 'id'], name='task_list_idx'),
+        ),
+    ]
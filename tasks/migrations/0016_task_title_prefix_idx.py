@@ -0,0 +1,17 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['title'], name='task_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.1 on 2026-10-19 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_task_title_prefix_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportdelivery',
+            name='claimed_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportdelivery',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'PENDING'), ('RENDERED', 'RENDERED'), ('SENDING', 'SENDING'), ('SENT', 'SENT'), ('SKIPPED', 'SKIPPED')], default='PENDING', max_length=20),
+        ),
+    ]
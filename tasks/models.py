@@ -26,6 +26,14 @@ class Task(models.Model):
         max_length=100, choices=STATUS_CHOICES, default=STATUS_CHOICES[0][0])
     priority = models.IntegerField(null=False)
 
+    class Meta:
+        indexes = [
+            # serves the keyset-paginated task lists, which all filter on user and deleted
+            models.Index(fields=["user", "deleted", "completed", "priority", "id"], name="task_list_idx"),
+            # serves the admin's title prefix search; the opclass lets PostgreSQL use it for LIKE
+            models.Index(fields=["title"], opclasses=["varchar_pattern_ops"], name="task_title_prefix_idx"),
+        ]
+
     def __str__(self):
         return f"{self.title}: {self.priority} | {self.user}"
 
@@ -38,11 +46,45 @@ class TaskHistory(models.Model):
     from_status = models.CharField(
         max_length=100, choices=STATUS_CHOICES, null=True)
     to_status = models.CharField(max_length=100, choices=STATUS_CHOICES)
-    timestamp = models.DateTimeField(auto_now=True)
+    timestamp = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Report(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     time = models.TimeField(null=True)
+    timezone = models.CharField(max_length=64, default="UTC")
+    next_run = models.DateTimeField(null=True, db_index=True)
     last_updated = models.DateTimeField(null=True)
     disabled = models.BooleanField(default=True)
+
+
+DELIVERY_STATUS_CHOICES = (
+    ("PENDING", "PENDING"),
+    ("RENDERED", "RENDERED"),
+    ("SENDING", "SENDING"),
+    ("SENT", "SENT"),
+    ("SKIPPED", "SKIPPED"),
+)
+
+
+# Delivery ledger: one row per report per day, so a retried or resumed run never sends twice;
+# only a worker that dies between sending and recording it can cause a repeat
+class ReportDelivery(models.Model):
+    report = models.ForeignKey(Report, on_delete=models.CASCADE)
+    date = models.DateField()
+    status = models.CharField(
+        max_length=20, choices=DELIVERY_STATUS_CHOICES, default=DELIVERY_STATUS_CHOICES[0][0])
+    body = models.TextField(null=True)
+    fingerprint = models.CharField(max_length=64, null=True)
+    dispatched_at = models.DateTimeField()
+    # set when a worker claims the entry for sending; see tasks.ledger.claim_delivery
+    claimed_at = models.DateTimeField(null=True)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["report", "date"], name="unique_report_delivery_per_day"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "dispatched_at"]),
+        ]
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from zoneinfo import ZoneInfo, available_timezones
+
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+
+def timezone_choices():
+    return [(name, name) for name in sorted(available_timezones())]
+
+
+def next_fire_time(local_time, tz_name, after=None):
+    # Returns the first UTC instant strictly after `after` at which the wall clock in
+    # `tz_name` reads `local_time`. A time skipped by a DST jump fires just after the
+    # jump (02:30 becomes 03:30), and a repeated time fires on its first occurrence.
+    after = after or timezone.now()
+    zone = ZoneInfo(tz_name)
+    local_date = after.astimezone(zone).date()
+
+    for days in range(3):
+        candidate = datetime.combine(
+            local_date + timedelta(days=days), local_time.replace(tzinfo=None), tzinfo=zone
+        ).astimezone(dt_timezone.utc)
+        if candidate > after:
+            return candidate
+
+
+def local_date(instant, tz_name):
+    return instant.astimezone(ZoneInfo(tz_name)).date()
+
+
+def recompute_next_runs(queryset, now=None):
+    # Every report sharing a (timezone, time) pair fires at the same instant, so each pair
+    # is computed once and written with a single CASE update per timezone instead of
+    # saving rows one by one. Run after a tzdata upgrade or a scheduling config change.
+    now = now or timezone.now()
+    queryset = queryset.filter(time__isnull=False)
+
+    schedule = {}
+    for tz_name, local_time in queryset.values_list("timezone", "time").distinct().order_by():
+        schedule.setdefault(tz_name, []).append(
+            When(time=local_time, then=Value(next_fire_time(local_time, tz_name, now)))
+        )
+
+    updated = 0
+    for tz_name, whens in schedule.items():
+        updated += queryset.filter(timezone=tz_name).update(
+            next_run=Case(*whens, output_field=DateTimeField())
+        )
+    return updated
@@ -1,49 +1,73 @@
-from collections import defaultdict
-from datetime import datetime, timedelta, timezone
-from functools import reduce
+from datetime import datetime, timezone
+from smtplib import SMTPException
 
-from celery.decorators import periodic_task
+from django.conf import settings
 from django.core.mail import send_mail
-from django.db import transaction
-from django.db.models import Q
-from django.template.loader import render_to_string
 
-from tasks.models import Report, Task
+from task_manager.celery import app
+from tasks.async_delivery import ReportDeliveryFailed, deliver_batch
+from tasks.digest import REPORT_SENDER, REPORT_SUBJECT, report_recipients
+from tasks.ledger import claim_delivery, finish_delivery, open_deliveries, prepare_delivery, release_delivery
 
 
-@periodic_task(run_every=timedelta(seconds=5))
+@app.task(time_limit=60, soft_time_limit=50)
 def batch_email():
-    print("running task...")
-
-    def user_summary(user):
-        def status_reducer(acc, task):
-            acc[task.status] += 1
-            return acc
-
-        tasks = Task.objects.filter(user=user, completed=False, deleted=False)
-        return {
-            "name": user.username.capitalize(),
-            "status": dict(
-                reduce(status_reducer, tasks, defaultdict(int))
-            )
-        }
-
-    start = datetime.now(timezone.utc) - timedelta(days=1)
-
-    report_set = Report.objects.select_for_update().filter(
-        last_updated__lte=start,
-        disabled=False
-    )
-
-    with transaction.atomic():
-        for report in report_set:
-            send_mail(
-                "Daily Status Report",
-                render_to_string("report.txt", user_summary(report.user)),
-                "tasks@taskmanager.com",
-                [report.user.email, "dummy@user.com"]
-            )
-
-            report.last_updated = datetime.now(timezone.utc).replace(
-                hour=report.time.hour, second=report.time.second)
-            report.save()
+    delivery_ids = open_deliveries(datetime.now(timezone.utc))
+    # only ids cross the broker; workers load the rows themselves
+    dispatch_deliveries(delivery_ids)
+
+
+def dispatch_deliveries(delivery_ids):
+    if settings.REPORT_DELIVERY_ENGINE == "async":
+        size = settings.REPORT_ASYNC_BATCH_SIZE
+        for start in range(0, len(delivery_ids), size):
+            deliver_report_batch.delay(delivery_ids[start:start + size])
+    else:
+        for delivery_id in delivery_ids:
+            generate_report.delay(delivery_id)
+
+
+@app.task(time_limit=30, soft_time_limit=20, rate_limit="600/m")
+def generate_report(delivery_id):
+    if prepare_delivery(delivery_id):
+        deliver_report.delay(delivery_id)
+
+
+@app.task(
+    time_limit=30,
+    soft_time_limit=20,
+    rate_limit="120/m",
+    autoretry_for=(SMTPException, ConnectionError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def deliver_report(delivery_id):
+    delivery = claim_delivery(delivery_id)
+    if delivery is None:
+        return
+
+    try:
+        send_mail(
+            REPORT_SUBJECT,
+            delivery.body,
+            REPORT_SENDER,
+            report_recipients(delivery.report.user)
+        )
+    except BaseException:
+        release_delivery(delivery_id)
+        raise
+    finish_delivery(delivery_id)
+
+
+@app.task(bind=True, time_limit=600, soft_time_limit=570, max_retries=5)
+def deliver_report_batch(self, delivery_ids):
+    failed = deliver_batch(delivery_ids)
+    if failed:
+        # retry only the failed entries, backing off like deliver_report; once the retries
+        # run out the task fails with the ids that were never sent
+        raise self.retry(
+            args=[failed],
+            countdown=2 ** self.request.retries,
+            exc=ReportDeliveryFailed(f"{len(failed)} of {len(delivery_ids)} report(s) not sent: {failed}"),
+        )
+    return len(delivery_ids)
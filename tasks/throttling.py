@@ -0,0 +1,174 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    # "60/min" -> a bucket holding 60 tokens that refills at one token per second
+    count, period = rate.split("/")
+    return int(count) / PERIODS[period[0]], int(count)
+
+
+class MemoryBucketStore:
+    # Buckets and write slots live in this process only; fine for a single web worker and for
+    # tests. Past max_buckets the least recently used bucket is dropped, which costs the same
+    # on every call however many clients there are.
+    max_buckets = 10000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, capacity, now):
+        with self.lock:
+            # popping and storing again moves the bucket to the recently used end
+            tokens, updated = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self.buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self.buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return wait == 0, wait
+
+    def acquire(self, key, limit, ttl):
+        # ttl only matters to stores shared between processes, which can die holding a slot
+        with self.lock:
+            held = self.slots.get(key, 0)
+            if held >= limit:
+                return False
+            self.slots[key] = held + 1
+            return True
+
+    def release(self, key):
+        with self.lock:
+            self.slots[key] -= 1
+
+
+class RedisBucketStore:
+    # Shared between every web worker; the refill and take happen atomically in one script
+    script = """
+    local rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+    local tokens = math.min(capacity, (tonumber(bucket[1]) or capacity) + (now - (tonumber(bucket[2]) or now)) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+    redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+    # Slots held by a process that died without releasing them expire ttl seconds after the
+    # last acquire
+    acquire_script = """
+    local held = redis.call("INCR", KEYS[1])
+    redis.call("EXPIRE", KEYS[1], ARGV[2])
+    if held > tonumber(ARGV[1]) then
+        redis.call("DECR", KEYS[1])
+        return 0
+    end
+    return 1
+    """
+    release_script = """
+    if (tonumber(redis.call("GET", KEYS[1])) or 0) > 0 then redis.call("DECR", KEYS[1]) end
+    """
+
+    def __init__(self):
+        import redis
+
+        self.client = redis.Redis.from_url(settings.RATE_LIMIT_REDIS_URL)
+        self.take_script = self.client.register_script(self.script)
+        self.acquire_slot = self.client.register_script(self.acquire_script)
+        self.release_slot = self.client.register_script(self.release_script)
+
+    def take(self, key, rate, capacity, now):
+        wait = float(self.take_script(keys=[f"ratelimit:{key}"], args=[rate, capacity, now]))
+        return wait == 0, wait
+
+    def acquire(self, key, limit, ttl):
+        return bool(self.acquire_slot(keys=[f"slots:{key}"], args=[limit, ttl]))
+
+    def release(self, key):
+        self.release_slot(keys=[f"slots:{key}"])
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = import_string(settings.RATE_LIMIT_STORE)()
+    return _store
+
+
+def reset_store(store=None):
+    # Swaps the process-wide bucket store, e.g. for a fresh MemoryBucketStore in each test
+    global _store
+    previous, _store = _store, store
+    return previous
+
+
+def take_token(scope, ident):
+    rate, capacity = parse_rate(settings.RATE_LIMITS[scope])
+    return get_store().take(f"{scope}:{ident}", rate, capacity, time.time())
+
+
+def client_ident(request):
+    # The client identity DRF throttles use: REMOTE_ADDR, or the X-Forwarded-For entry picked
+    # by REST_FRAMEWORK["NUM_PROXIES"] behind a proxy, so views and the API agree on who is who
+    return BaseThrottle().get_ident(request)
+
+
+def too_many_requests(wait):
+    response = HttpResponse("Too many requests", status=429)
+    response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+class RateLimitMixin:
+    # Token bucket for plain Django views, keyed by client IP under rate_limit_scope
+    rate_limit_scope = None
+    rate_limit_methods = ("post",)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.rate_limit_methods:
+            return super().dispatch(request, *args, **kwargs)
+
+        allowed, wait = take_token(self.rate_limit_scope, f"ip:{client_ident(request)}")
+        if not allowed:
+            return too_many_requests(wait)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class WriteConcurrencyLimitMixin:
+    # Turns writes away while WRITE_CONCURRENCY_LIMIT of them are already running, instead
+    # of letting them queue on the database write lock in cascadeUpdate. The running writes
+    # are counted in the rate limit store: across every web process with RedisBucketStore,
+    # but only within one process with MemoryBucketStore, where a server that runs one
+    # request per process (prefork, sync workers) never reaches the limit.
+    write_methods = ("post", "put", "patch", "delete")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.write_methods:
+            return super().dispatch(request, *args, **kwargs)
+
+        store = get_store()
+        if not store.acquire("writes", settings.WRITE_CONCURRENCY_LIMIT, settings.WRITE_SLOT_TIMEOUT):
+            return too_many_requests(1)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            store.release("writes")
@@ -1,23 +1,18 @@
-from datetime import datetime, timedelta, timezone
-
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, F, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.lookups import Exact
 from django.http import HttpResponseRedirect
 from django.views.generic import ListView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
-from django_filters.rest_framework import (BooleanFilter, CharFilter,
-                                           ChoiceFilter, DateFromToRangeFilter,
-                                           DjangoFilterBackend, FilterSet,
-                                           ModelChoiceFilter)
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.serializers import ModelSerializer
-from rest_framework.viewsets import ModelViewSet
 
 from tasks.forms import (ScheduleReportForm, TaskForm, TaskUserCreationForm,
                          TaskUserLoginForm)
-from tasks.models import STATUS_CHOICES, Report, Task, TaskHistory
+from tasks.models import Report, Task, TaskHistory
+from tasks.scheduling import next_fire_time
+from tasks.throttling import RateLimitMixin, WriteConcurrencyLimitMixin
 
 
 @transaction.atomic
@@ -39,7 +34,7 @@ def cascadeUpdate(priority, user, task=None):
         Task.objects.bulk_update(to_be_changed, ["priority"])
 
 
-class TaskEditView(LoginRequiredMixin):
+class TaskEditView(LoginRequiredMixin, WriteConcurrencyLimitMixin):
     success_url = "/tasks"
 
     def get_queryset(self):
@@ -59,55 +54,81 @@ class TaskEditView(LoginRequiredMixin):
         return HttpResponseRedirect(self.get_success_url())
 
 
-class CurrentTasksView(LoginRequiredMixin, ListView):
-    template_name = "current.html"
-    context_object_name = "tasks"
+def equal_to(**filters):
+    # Django writes a boolean filter as "NOT deleted" or "completed", which SQLite does not
+    # treat as an equality on the index column, so task_list_idx could not give the rows in
+    # page order and every page sorted the user's whole list; "deleted = false" lets it
+    return [Exact(F(field), Value(value)) for field, value in filters.items()]
 
-    def get_context_data(self, **kwargs):
-        context = super(CurrentTasksView, self).get_context_data(**kwargs)
-        context.update({
-            "total_count": Task.objects.filter(deleted=False, user=self.request.user).count(),
-            "completed_count": Task.objects.filter(deleted=False, completed=True, user=self.request.user).count(),
-            "report_id": Report.objects.filter(user=self.request.user)[0].id,
-        })
-        return context
 
-    def get_queryset(self):
-        return Task.objects.filter(deleted=False, completed=False, user=self.request.user).order_by("priority")
+def keyset_after(model, fields, values):
+    # (a, b, c) > (x, y, z) as a row value comparison, which SQLite and PostgreSQL both answer
+    # with one seek into the (user, deleted, completed, priority, id) index however deep the page
+    quote = connection.ops.quote_name
+    model_fields = [model._meta.get_field(field) for field in fields]
+    columns = ", ".join(f"{quote(model._meta.db_table)}.{quote(field.column)}" for field in model_fields)
+    placeholders = ", ".join(["%s"] * len(values))
+    # the cursor holds plain integers; PostgreSQL will not compare 0 with a boolean column
+    params = [field.to_python(value) for field, value in zip(model_fields, values)]
+    return RawSQL(f"({columns}) > ({placeholders})", params, output_field=BooleanField())
 
 
-class CompletedTasksView(LoginRequiredMixin, ListView):
-    template_name = "completed.html"
+class TaskListView(LoginRequiredMixin, ListView):
     context_object_name = "tasks"
-
-    def get_context_data(self, **kwargs):
-        context = super(CompletedTasksView, self).get_context_data(**kwargs)
-        context.update({
-            "total_count": Task.objects.filter(deleted=False, user=self.request.user).count(),
-            "completed_count": Task.objects.filter(deleted=False, completed=True, user=self.request.user).count(),
-            "report_id": Report.objects.filter(user=self.request.user)[0].id,
-        })
-        return context
+    page_size = 50
+    ordering = ("priority", "id")
+    task_filter = {}
 
     def get_queryset(self):
-        return Task.objects.filter(deleted=False, completed=True, user=self.request.user).order_by("priority")
+        queryset = Task.objects.filter(*equal_to(deleted=False, **self.task_filter), user=self.request.user).only(
+            "id", "title", "completed", "priority", "created_date").order_by(*self.ordering)
 
+        try:
+            cursor = [int(value) for value in self.request.GET["after"].split(",")]
+        except (KeyError, ValueError):
+            cursor = None
+        if cursor and len(cursor) == len(self.ordering):
+            queryset = queryset.filter(keyset_after(Task, self.ordering, cursor))
 
-class AllTasksView(LoginRequiredMixin, ListView):
-    template_name = "all.html"
-    context_object_name = "tasks"
+        # one extra row tells us whether there is a next page without counting
+        return queryset[:self.page_size + 1]
 
     def get_context_data(self, **kwargs):
-        context = super(AllTasksView, self).get_context_data(**kwargs)
+        context = super(TaskListView, self).get_context_data(**kwargs)
+        tasks = list(context["tasks"])
+        next_cursor = None
+        if len(tasks) > self.page_size:
+            tasks = tasks[:self.page_size]
+            next_cursor = ",".join(str(int(getattr(tasks[-1], field))) for field in self.ordering)
+
         context.update({
-            "total_count": Task.objects.filter(deleted=False, user=self.request.user).count(),
-            "completed_count": Task.objects.filter(deleted=False, completed=True, user=self.request.user).count(),
-            "report_id": Report.objects.filter(user=self.request.user)[0].id,
+            "tasks": tasks,
+            "next_cursor": next_cursor,
+            "report_id": Report.objects.filter(user=self.request.user).values_list("id", flat=True).first(),
+            # the one part of a page that grows with the account: an index-only scan of the
+            # user's rows in task_list_idx, about 9ms per page at 50k tasks on SQLite
+            # (benchmarks/task_list.py)
+            **Task.objects.filter(*equal_to(deleted=False), user=self.request.user).aggregate(
+                total_count=Count("id"),
+                completed_count=Count("id", filter=Q(completed=True)),
+            ),
         })
         return context
 
-    def get_queryset(self):
-        return Task.objects.filter(deleted=False, user=self.request.user).order_by("completed", "priority")
+
+class CurrentTasksView(TaskListView):
+    template_name = "current.html"
+    task_filter = {"completed": False}
+
+
+class CompletedTasksView(TaskListView):
+    template_name = "completed.html"
+    task_filter = {"completed": True}
+
+
+class AllTasksView(TaskListView):
+    template_name = "all.html"
+    ordering = ("completed", "priority", "id")
 
 
 class AddTaskView(TaskEditView, CreateView):
@@ -153,28 +174,14 @@ class ScheduleReportView(LoginRequiredMixin, UpdateView):
     queryset = Report.objects.all()
 
     def form_valid(self, form):
-        self.object = form.save()
-
-        # last_updated is set to the same day so that the next report is sent the following day
-
-        target = datetime.now().replace(hour=self.object.time.hour,
-                                        minute=self.object.time.minute, second=0).time()
-
-        self.object.last_updated = datetime.now(timezone.utc).replace(
-            hour=self.object.time.hour,
-            minute=self.object.time.minute,
-            second=0
-        ) - (
-            # last_updated is set to the day before if the current time hasn't passed the report time
-            timedelta(days=1) if target >= datetime.now().time()
-            else timedelta(days=0)
-        )
-
+        self.object = form.save(commit=False)
+        self.object.next_run = next_fire_time(self.object.time, self.object.timezone)
         self.object.save()
         return HttpResponseRedirect(self.get_success_url())
 
 
-class UserCreateView(UserPassesTestMixin, CreateView):
+class UserCreateView(RateLimitMixin, UserPassesTestMixin, CreateView):
+    rate_limit_scope = "signup"
     form_class = TaskUserCreationForm
     template_name = "registration/signup.html"
     success_url = "/user/login"
@@ -193,60 +200,3 @@ class UserCreateView(UserPassesTestMixin, CreateView):
 
 class UserLoginView(LoginView):
     form_class = TaskUserLoginForm
-
-
-# API Section
-
-
-class UserSerializer(ModelSerializer):
-    class Meta:
-        model = User
-        fields = ["username"]
-
-
-class TaskSerializer(ModelSerializer):
-    user = UserSerializer(read_only=True)
-
-    class Meta:
-        model = Task
-        fields = "__all__"
-
-
-class TaskFilter(FilterSet):
-    title = CharFilter(lookup_expr="icontains")
-    status = ChoiceFilter(choices=STATUS_CHOICES)
-    completed = BooleanFilter()
-
-
-class TaskApiViewset(ModelViewSet):
-    permission_classes = [IsAuthenticated]
-    queryset = Task.objects.filter(deleted=False)
-    serializer_class = TaskSerializer
-
-    filter_backends = [DjangoFilterBackend]
-    filterset_class = TaskFilter
-
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-
-
-class TaskHistorySerializer(ModelSerializer):
-    class Meta:
-        model = TaskHistory
-        fields = "__all__"
-
-
-class TaskHistoryFilter(FilterSet):
-    task = ModelChoiceFilter(queryset=Task.objects.filter(deleted=False))
-    timestamp = DateFromToRangeFilter()
-    from_status = ChoiceFilter(choices=STATUS_CHOICES)
-    to_status = ChoiceFilter(choices=STATUS_CHOICES)
-
-
-class TaskHistoryApiViewset(ModelViewSet):
-    permission_classes = [IsAuthenticated]
-    serializer_class = TaskHistorySerializer
-    queryset = TaskHistory.objects.all()
-
-    filter_backends = [DjangoFilterBackend]
-    filterset_class = TaskHistoryFilter